@@ -0,0 +1,381 @@
+"""Pre-warmed Python interpreter pool for running scripts without cold starts"""
+
+import asyncio
+import os
+import runpy
+import selectors
+import signal
+import socket
+import struct
+import sys
+import threading
+import time
+import traceback
+from pathlib import Path
+from typing import Optional
+
+# Result tuple sent back by a worker:
+# (exit_code, stdout_bytes, stdout_truncated, stderr_bytes, stderr_truncated, timed_out)
+RunResult = tuple[int, bytes, bool, bytes, bool, bool]
+
+_MSG_HEADER = struct.Struct(">I")
+
+# Request frame body: timeout, script path length, cwd length, then the two
+# UTF-8 strings
+_REQUEST_HEADER = struct.Struct(">dII")
+
+# Result frame body: exit code, timed-out/stdout-truncated/stderr-truncated
+# flags, stdout length, stderr length, then the two byte payloads
+_RESULT_HEADER = struct.Struct(">qBBBII")
+
+# Upper bound on a single frame; anything larger is treated as a broken peer
+_MAX_FRAME_BYTES = 16 * 1024 * 1024
+
+# How often the worker polls for child exit while draining output
+_POLL_INTERVAL_SECONDS = 0.05
+# How long to keep draining output after the direct child has exited; the
+# pipe write ends may be inherited by background children that never close
+# them, so EOF cannot be relied on
+_DRAIN_GRACE_SECONDS = 0.25
+
+
+def _send_msg(sock: socket.socket, payload: bytes) -> None:
+    sock.sendall(_MSG_HEADER.pack(len(payload)) + payload)
+
+
+def _recv_exact(sock: socket.socket, n: int) -> Optional[bytes]:
+    buf = bytearray()
+    while len(buf) < n:
+        chunk = sock.recv(n - len(buf))
+        if not chunk:
+            return None
+        buf += chunk
+    return bytes(buf)
+
+
+def _recv_msg(sock: socket.socket) -> Optional[bytes]:
+    header = _recv_exact(sock, _MSG_HEADER.size)
+    if header is None:
+        return None
+    (length,) = _MSG_HEADER.unpack(header)
+    if length > _MAX_FRAME_BYTES:
+        return None
+    return _recv_exact(sock, length)
+
+
+def _encode_request(script_path: str, cwd: str, timeout_seconds: float) -> bytes:
+    path_bytes = script_path.encode()
+    cwd_bytes = cwd.encode()
+    return (
+        _REQUEST_HEADER.pack(timeout_seconds, len(path_bytes), len(cwd_bytes))
+        + path_bytes
+        + cwd_bytes
+    )
+
+
+def _decode_request(payload: bytes) -> tuple[str, str, float]:
+    timeout_seconds, path_len, cwd_len = _REQUEST_HEADER.unpack_from(payload)
+    if len(payload) != _REQUEST_HEADER.size + path_len + cwd_len:
+        raise ValueError("Malformed request frame")
+    path_end = _REQUEST_HEADER.size + path_len
+    return (
+        payload[_REQUEST_HEADER.size:path_end].decode(),
+        payload[path_end:].decode(),
+        timeout_seconds,
+    )
+
+
+def _encode_result(result: RunResult) -> bytes:
+    exit_code, stdout, stdout_truncated, stderr, stderr_truncated, timed_out = result
+    return (
+        _RESULT_HEADER.pack(
+            exit_code,
+            timed_out,
+            stdout_truncated,
+            stderr_truncated,
+            len(stdout),
+            len(stderr),
+        )
+        + stdout
+        + stderr
+    )
+
+
+def _decode_result(payload: bytes) -> RunResult:
+    (
+        exit_code,
+        timed_out,
+        stdout_truncated,
+        stderr_truncated,
+        stdout_len,
+        stderr_len,
+    ) = _RESULT_HEADER.unpack_from(payload)
+    if len(payload) != _RESULT_HEADER.size + stdout_len + stderr_len:
+        raise ValueError("Malformed result frame")
+    stdout_end = _RESULT_HEADER.size + stdout_len
+    return (
+        exit_code,
+        payload[_RESULT_HEADER.size:stdout_end],
+        bool(stdout_truncated),
+        payload[stdout_end:],
+        bool(stderr_truncated),
+        bool(timed_out),
+    )
+
+
+def _run_script_in_child(
+    script_path: str, cwd: str, stdout_w: int, stderr_w: int
+) -> None:
+    """Run the script in a forked child with stdout/stderr redirected.
+    Never returns; exits the child with the script's exit code."""
+    os.dup2(stdout_w, 1)
+    os.dup2(stderr_w, 2)
+    # Close every other inherited descriptor (listening socket, other
+    # clients' connections, pool sockets) before touching user code; plain
+    # fork keeps all fds open since PEP 446 non-inheritable flags only take
+    # effect across exec
+    try:
+        max_fd = os.sysconf("SC_OPEN_MAX")
+        if max_fd <= 0 or max_fd > 65536:
+            max_fd = 65536
+    except (ValueError, OSError):
+        max_fd = 65536
+    os.closerange(3, max_fd)
+    # Keep server configuration (notably the passcode) out of the script's
+    # environment
+    os.environ.pop("CHATGENERAL_PASSCODE", None)
+    exit_code = 0
+    try:
+        os.chdir(cwd)
+        sys.argv = [script_path]
+        # Match `python script.py` semantics: the script's directory goes at
+        # the front of sys.path (runpy.run_path does not touch sys.path), so
+        # scripts can import sibling modules they create
+        sys.path.insert(0, cwd)
+        runpy.run_path(script_path, run_name="__main__")
+    except SystemExit as e:
+        if e.code is None:
+            exit_code = 0
+        elif isinstance(e.code, int):
+            exit_code = e.code
+        else:
+            print(e.code, file=sys.stderr)
+            exit_code = 1
+    except BaseException:
+        traceback.print_exc()
+        exit_code = 1
+    try:
+        sys.stdout.flush()
+        sys.stderr.flush()
+    except Exception:
+        pass
+    os._exit(exit_code)
+
+
+def _run_request(
+    script_path: str, cwd: str, timeout_seconds: float, output_cap_bytes: int
+) -> RunResult:
+    """Fork a child to run the script; enforce the timeout and output caps.
+    Runs in the worker (template) process."""
+    stdout_r, stdout_w = os.pipe()
+    stderr_r, stderr_w = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        os.close(stdout_r)
+        os.close(stderr_r)
+        _run_script_in_child(script_path, cwd, stdout_w, stderr_w)
+    os.close(stdout_w)
+    os.close(stderr_w)
+
+    buffers = {stdout_r: bytearray(), stderr_r: bytearray()}
+    truncated = {stdout_r: False, stderr_r: False}
+    os.set_blocking(stdout_r, False)
+    os.set_blocking(stderr_r, False)
+    sel = selectors.DefaultSelector()
+    sel.register(stdout_r, selectors.EVENT_READ)
+    sel.register(stderr_r, selectors.EVENT_READ)
+
+    deadline = time.monotonic() + timeout_seconds
+    timed_out = False
+    killed = False
+    child_status: Optional[int] = None
+    drain_deadline: Optional[float] = None
+    open_fds = 2
+    while open_fds:
+        now = time.monotonic()
+        if child_status is None:
+            wpid, status = os.waitpid(pid, os.WNOHANG)
+            if wpid == pid:
+                child_status = status
+                # The direct child is done; drain briefly rather than waiting
+                # for pipe EOF, which never comes if the script left
+                # background children holding the pipe write ends
+                drain_deadline = now + _DRAIN_GRACE_SECONDS
+            elif now >= deadline and not killed:
+                timed_out = True
+                os.kill(pid, signal.SIGKILL)
+                killed = True
+        if drain_deadline is not None and now >= drain_deadline:
+            break
+        events = sel.select(timeout=_POLL_INTERVAL_SECONDS)
+        for key, _ in events:
+            chunk = os.read(key.fd, 64 * 1024)
+            if not chunk:
+                sel.unregister(key.fd)
+                os.close(key.fd)
+                open_fds -= 1
+                continue
+            if truncated[key.fd]:
+                continue  # keep draining, discard the excess
+            buf = buffers[key.fd]
+            space = output_cap_bytes - len(buf)
+            if len(chunk) > space:
+                buf += chunk[:space]
+                truncated[key.fd] = True
+                if not killed:
+                    os.kill(pid, signal.SIGKILL)
+                    killed = True
+            else:
+                buf += chunk
+    remaining_fds = list(sel.get_map())
+    sel.close()
+    for fd in remaining_fds:
+        os.close(fd)
+
+    # Reap the child if the drain loop didn't. Pipe EOF does not imply exit
+    # (the script may close its stdio and keep running), so the deadline is
+    # enforced here as well.
+    while child_status is None:
+        wpid, status = os.waitpid(pid, os.WNOHANG)
+        if wpid == pid:
+            child_status = status
+            break
+        if not killed and time.monotonic() >= deadline:
+            timed_out = True
+            os.kill(pid, signal.SIGKILL)
+            killed = True
+        time.sleep(_POLL_INTERVAL_SECONDS)
+    exit_code = os.waitstatus_to_exitcode(child_status)
+    return (
+        exit_code,
+        bytes(buffers[stdout_r]),
+        truncated[stdout_r],
+        bytes(buffers[stderr_r]),
+        truncated[stderr_r],
+        timed_out,
+    )
+
+
+def _worker_main(sock: socket.socket, output_cap_bytes: int) -> None:
+    """Request loop of a pre-warmed worker process.
+    Exits when the server closes its end of the socket."""
+    while True:
+        try:
+            payload = _recv_msg(sock)
+        except OSError:
+            os._exit(0)
+        if payload is None:
+            os._exit(0)
+        try:
+            script_path, cwd, timeout_seconds = _decode_request(payload)
+        except Exception:
+            os._exit(0)  # corrupt frame: the protocol is broken, bail out
+        try:
+            result = _run_request(script_path, cwd, timeout_seconds, output_cap_bytes)
+        except Exception as e:
+            result = (-1, b"", False, f"Worker error: {e}".encode(), False, False)
+        try:
+            _send_msg(sock, _encode_result(result))
+        except OSError:
+            os._exit(0)
+
+
+class _Worker:
+    def __init__(self, pid: int, sock: socket.socket):
+        self.pid = pid
+        self.sock = sock
+
+
+def _reap(pid: int) -> None:
+    try:
+        os.waitpid(pid, 0)
+    except ChildProcessError:
+        pass
+
+
+class InterpreterPool:
+    """Pool of pre-forked interpreter workers for running Python scripts.
+
+    Each worker is a warm CPython process that forks a fresh child per
+    script, so every run gets a clean interpreter state while skipping the
+    ~30-80 ms of interpreter and site initialization that a cold
+    `python script.py` spawn pays. Workers enforce the timeout and output
+    caps themselves; a worker that stops responding is killed and replaced.
+
+    One known divergence from the cold-start path: forked children inherit
+    the worker's sys.modules, so modules the server happens to have imported
+    are already loaded when the script runs.
+    """
+
+    def __init__(self, size: Optional[int] = None, output_cap_bytes: int = 1024 * 1024):
+        self._size = size or min(4, os.cpu_count() or 1)
+        self._output_cap_bytes = output_cap_bytes
+        self._idle: asyncio.Queue[_Worker] = asyncio.Queue()
+
+    def start(self) -> None:
+        """Fork the initial workers. Call before the event loop starts serving."""
+        for _ in range(self._size):
+            self._spawn()
+
+    def _spawn(self) -> None:
+        server_sock, worker_sock = socket.socketpair()
+        pid = os.fork()
+        if pid == 0:
+            server_sock.close()
+            try:
+                _worker_main(worker_sock, self._output_cap_bytes)
+            finally:
+                os._exit(0)
+        worker_sock.close()
+        self._idle.put_nowait(_Worker(pid, server_sock))
+
+    def _discard(self, worker: _Worker) -> None:
+        """Kill a misbehaving worker and replace it to keep the pool full"""
+        try:
+            worker.sock.close()
+        except OSError:
+            pass
+        try:
+            os.kill(worker.pid, signal.SIGKILL)
+        except ProcessLookupError:
+            pass
+        threading.Thread(target=_reap, args=(worker.pid,), daemon=True).start()
+        self._spawn()
+
+    async def run(
+        self, script_path: Path, cwd: Path, timeout_seconds: float
+    ) -> RunResult:
+        """Run a Python script on an idle worker and return its result"""
+        worker = await self._idle.get()
+
+        def _exchange():
+            _send_msg(
+                worker.sock,
+                _encode_request(str(script_path), str(cwd), timeout_seconds),
+            )
+            return _recv_msg(worker.sock)
+
+        try:
+            # The worker enforces timeout_seconds itself; the extra margin is
+            # a backstop against a hung worker, which gets killed and replaced
+            payload = await asyncio.wait_for(
+                asyncio.to_thread(_exchange), timeout=timeout_seconds + 5
+            )
+            if payload is None:
+                raise RuntimeError("Interpreter worker closed its socket")
+            result = _decode_result(payload)
+        except BaseException:
+            self._discard(worker)
+            raise
+        self._idle.put_nowait(worker)
+        return result
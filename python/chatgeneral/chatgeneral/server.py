@@ -1,21 +1,36 @@
 """FastAPI server for executing Python scripts"""
 
 import asyncio
+import hmac
 import os
+import stat
 import sys
-from datetime import datetime
+import tempfile
+import threading
+import time
+from contextlib import asynccontextmanager
 from pathlib import Path
 from typing import Optional
 
+import msgspec
 from fastapi import FastAPI, HTTPException, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import FileResponse, Response
-from pydantic import BaseModel
+
+from .interpreter_pool import InterpreterPool
 
 # Global variable to store the server's passcode
 SERVER_PASSCODE: Optional[str] = None
 
-app = FastAPI(title="ChatGeneral Script Execution Server")
+@asynccontextmanager
+async def _lifespan(_app: FastAPI):
+    # Runs in every server process, including spawned uvicorn workers
+    _configure_child_watcher()
+    await _start_interpreter_pool()
+    yield
+
+
+app = FastAPI(title="ChatGeneral Script Execution Server", lifespan=_lifespan)
 
 # Enable CORS for specific origins
 app.add_middleware(
@@ -32,15 +47,33 @@ app.add_middleware(
 # Global variable to store the server's working directory
 SERVER_WORKING_DIR: Optional[Path] = None
 
+# Fully resolved working directory as a string, computed once at configuration
+# time so per-request path checks don't have to resolve it again
+_RESOLVED_BASE: Optional[str] = None
+
+# Length of the working-directory prefix (including the trailing separator),
+# used to derive working-dir-relative paths by string slicing
+_BASE_STR_LEN = 0
+
+# Whether the tmp/ directory has been created (avoids an mkdir per request)
+_TMP_DIR_READY = False
+
+# Pool of pre-warmed interpreter workers for Python scripts (started by
+# run_server; None when unavailable, in which case scripts are run with a
+# cold-started subprocess)
+_INTERPRETER_POOL: Optional[InterpreterPool] = None
 
-class RunScriptRequest(BaseModel):
+
+# msgspec structs skip Pydantic's validator stack and re-serialization,
+# which is a measurable per-request saving on the hot script-run path
+class RunScriptRequest(msgspec.Struct):
     script: str
+    passcode: str
     scriptType: str = "python"  # "python" or "shell"
     timeout: int = 10
-    passcode: str
 
 
-class RunScriptResponse(BaseModel):
+class RunScriptResponse(msgspec.Struct):
     success: bool
     scriptDir: Optional[str] = None
     scriptPath: Optional[str] = None
@@ -54,136 +87,346 @@ class RunScriptResponse(BaseModel):
     error: Optional[str] = None
 
 
-def validate_passcode(passcode: str) -> bool:
-    """Validate the passcode"""
-    return passcode == SERVER_PASSCODE
+# Cache of recently validated passcodes (value is the time of validation).
+# Only successful validations are cached, so the comparison itself runs at
+# most once per distinct passcode per TTL window. This keeps the hot
+# /api/run-script path cheap if the comparison is later replaced with a
+# hashed-secret check.
+_PASSCODE_CACHE: dict[str, float] = {}
+_PASSCODE_CACHE_LOCK = threading.Lock()
+_PASSCODE_CACHE_TTL_SECONDS = 60
+_PASSCODE_CACHE_MAX_SIZE = 128
 
 
-def is_safe_path(base_dir: Path, requested_path: str) -> bool:
-    """Check if the requested path is within the base directory (prevent directory traversal)"""
+def validate_passcode(passcode: str) -> bool:
+    """Validate the passcode"""
+    now = time.monotonic()
+    last_validated = _PASSCODE_CACHE.get(passcode)
+    if (
+        last_validated is not None
+        and now - last_validated < _PASSCODE_CACHE_TTL_SECONDS
+    ):
+        return True
+    if SERVER_PASSCODE is None or not hmac.compare_digest(
+        passcode.encode(), SERVER_PASSCODE.encode()
+    ):
+        return False
+    with _PASSCODE_CACHE_LOCK:
+        # FIFO eviction keeps the cache bounded (dicts preserve insertion order)
+        while len(_PASSCODE_CACHE) >= _PASSCODE_CACHE_MAX_SIZE:
+            _PASSCODE_CACHE.pop(next(iter(_PASSCODE_CACHE)))
+        _PASSCODE_CACHE[passcode] = now
+    return True
+
+
+def is_safe_path(requested_path: str) -> bool:
+    """Check if the requested path is within the working directory (prevent directory traversal)"""
+    base = _RESOLVED_BASE
+    if base is None:
+        return False
+    # Fast path: reject absolute paths and traversal attempts without any
+    # filesystem syscalls
+    normalized = os.path.normpath(requested_path)
+    if (
+        os.path.isabs(normalized)
+        or normalized == ".."
+        or normalized.startswith(".." + os.sep)
+    ):
+        return False
     try:
-        base = base_dir.resolve()
-        target = (base / requested_path).resolve()
-        return target.is_relative_to(base)
-    except (ValueError, OSError):
+        # realpath guards against symlinks escaping the working directory;
+        # it raises ValueError for paths with embedded null bytes
+        target = os.path.realpath(os.path.join(base, normalized))
+    except (OSError, ValueError):
         return False
+    return target == base or target.startswith(base + os.sep)
+
+
+# Per-stream cap on captured subprocess output
+_OUTPUT_CAP_BYTES = 1024 * 1024
+_OUTPUT_TRUNCATED_MARKER = b"\n...[truncated]"
+
+
+# How long to keep reading the pipes after the direct child has exited;
+# descendants it spawned may hold the write ends open indefinitely
+_DRAIN_GRACE_SECONDS = 0.25
+# How often to poll for the direct child's exit
+_POLL_INTERVAL_SECONDS = 0.05
+
+
+async def _wait_for_exit(process: asyncio.subprocess.Process) -> None:
+    """Wait for the direct child to exit by polling its return code.
+    Process.wait() resolves only once the pipes also reach EOF, which never
+    happens if the script left background children holding the write ends."""
+    while process.returncode is None:
+        await asyncio.sleep(_POLL_INTERVAL_SECONDS)
+
+
+async def _drain_stream_capped(
+    stream: asyncio.StreamReader,
+    process: asyncio.subprocess.Process,
+    buf: bytearray,
+    truncated: dict[str, bool],
+    key: str,
+) -> None:
+    """Read a subprocess stream into buf up to the output cap, then keep
+    draining (discarding the excess) until EOF so descendants never block on
+    a full pipe; kills the process once the cap is exceeded. Data read so
+    far survives cancellation in buf/truncated."""
+    while True:
+        chunk = await stream.read(64 * 1024)
+        if not chunk:
+            return
+        if truncated[key]:
+            continue
+        space = _OUTPUT_CAP_BYTES - len(buf)
+        if len(chunk) > space:
+            buf += chunk[:space]
+            truncated[key] = True
+            # Stop the flood at the source; draining continues above
+            try:
+                process.kill()
+            except ProcessLookupError:
+                pass
+        else:
+            buf += chunk
+
+
+async def _communicate_capped(
+    process: asyncio.subprocess.Process,
+) -> tuple[bytes, bool, bytes, bool]:
+    """Like process.communicate(), but bounds each captured stream and
+    tolerates descendants that keep the pipes open after the child exits"""
+    stdout_buf = bytearray()
+    stderr_buf = bytearray()
+    truncated = {"stdout": False, "stderr": False}
+    readers = [
+        asyncio.ensure_future(
+            _drain_stream_capped(process.stdout, process, stdout_buf, truncated, "stdout")
+        ),
+        asyncio.ensure_future(
+            _drain_stream_capped(process.stderr, process, stderr_buf, truncated, "stderr")
+        ),
+    ]
+    try:
+        await _wait_for_exit(process)
+        # Wait briefly for pipe EOF after the direct child exits; background
+        # children holding the write ends must not stall the request
+        await asyncio.wait(readers, timeout=_DRAIN_GRACE_SECONDS)
+    finally:
+        abandoned = any(not task.done() for task in readers)
+        for task in readers:
+            task.cancel()
+        await asyncio.gather(*readers, return_exceptions=True)
+    if abandoned:
+        # The pipes never reached EOF, so the transport would keep their fds
+        # open until garbage collection; the child has already exited, so
+        # closing it only releases the pipes
+        process._transport.close()
+    return (
+        bytes(stdout_buf),
+        truncated["stdout"],
+        bytes(stderr_buf),
+        truncated["stderr"],
+    )
+
+
+def _mark_capped(data: bytes, truncated: bool) -> bytes:
+    """Append the truncation marker to captured output if it was capped"""
+    if truncated:
+        return data + _OUTPUT_TRUNCATED_MARKER
+    return data
 
 
 async def run_script_with_timeout(
     script_path: Path, timeout_seconds: int, cwd: Path, script_type: str = "python"
-) -> tuple[int, str, str, bool]:
+) -> tuple[int, bytes, bytes, bool]:
     """
     Execute a script with a timeout.
-    Returns: (exit_code, stdout, stderr, timed_out)
+    Returns: (exit_code, stdout_bytes, stderr_bytes, timed_out)
+
+    Output is kept as bytes so it is decoded exactly once, when the JSON
+    response is built.
     """
+    # Python scripts run on a pre-warmed worker when the pool is available,
+    # skipping interpreter startup; fall back to a cold-started subprocess
+    if script_type == "python" and _INTERPRETER_POOL is not None:
+        try:
+            (
+                exit_code,
+                stdout_bytes,
+                stdout_truncated,
+                stderr_bytes,
+                stderr_truncated,
+                timed_out,
+            ) = await _INTERPRETER_POOL.run(script_path, cwd, timeout_seconds)
+        except Exception as e:
+            # The worker may already have started the script, so falling back
+            # to the subprocess path here could execute it a second time
+            return -1, b"", f"Error executing script: {str(e)}".encode(), False
+        else:
+            if timed_out:
+                return -1, b"", b"Script execution timed out", True
+            return (
+                exit_code,
+                _mark_capped(stdout_bytes, stdout_truncated),
+                _mark_capped(stderr_bytes, stderr_truncated),
+                False,
+            )
+
     try:
         if script_type == "python":
             cmd = [sys.executable, str(script_path)]
         elif script_type == "shell":
             cmd = ["/bin/bash", str(script_path)]
         else:
-            return -1, "", f"Unsupported script type: {script_type}", False
-        
+            return -1, b"", f"Unsupported script type: {script_type}".encode(), False
+
+        # Don't leak server configuration (notably the passcode, which
+        # run_server places in the environment for worker processes) into
+        # the script's environment
+        env = {
+            k: v for k, v in os.environ.items() if k != "CHATGENERAL_PASSCODE"
+        }
         process = await asyncio.create_subprocess_exec(
             *cmd,
             stdout=asyncio.subprocess.PIPE,
             stderr=asyncio.subprocess.PIPE,
             cwd=str(cwd),
+            env=env,
         )
 
         try:
-            stdout_bytes, stderr_bytes = await asyncio.wait_for(
-                process.communicate(), timeout=timeout_seconds
+            stdout_bytes, stdout_truncated, stderr_bytes, stderr_truncated = (
+                await asyncio.wait_for(
+                    _communicate_capped(process), timeout=timeout_seconds
+                )
+            )
+            return (
+                process.returncode or 0,
+                _mark_capped(stdout_bytes, stdout_truncated),
+                _mark_capped(stderr_bytes, stderr_truncated),
+                False,
             )
-            stdout = stdout_bytes.decode("utf-8", errors="replace")
-            stderr = stderr_bytes.decode("utf-8", errors="replace")
-            return process.returncode or 0, stdout, stderr, False
         except asyncio.TimeoutError:
             # Kill the process if it times out
             process.kill()
-            await process.wait()
-            return -1, "", "Script execution timed out", True
+            await _wait_for_exit(process)
+            return -1, b"", b"Script execution timed out", True
 
     except Exception as e:
-        return -1, "", f"Error executing script: {str(e)}", False
+        return -1, b"", f"Error executing script: {str(e)}".encode(), False
 
 
-def get_files_in_directory(directory: Path) -> set[str]:
-    """Get all files in a directory (non-recursive)"""
+def get_created_entries(directory: Path, exclude: str) -> tuple[list[str], list[str]]:
+    """Get sorted lists of (files, directories) in a directory (non-recursive),
+    excluding the given name"""
+    # os.scandir reuses the d_type from readdir, avoiding a stat() per entry
+    files: list[str] = []
+    directories: list[str] = []
     try:
-        return {f.name for f in directory.iterdir() if f.is_file()}
+        with os.scandir(directory) as entries:
+            for e in entries:
+                if e.name == exclude:
+                    continue
+                (files if e.is_file() else directories).append(e.name)
     except Exception:
-        return set()
+        pass
+    return sorted(files), sorted(directories)
 
 
-def get_directories_in_directory(directory: Path) -> set[str]:
-    """Get all directories in a directory (non-recursive)"""
-    try:
-        return {f.name for f in directory.iterdir() if f.is_dir()}
-    except Exception:
-        return set()
+def _prepare_script(
+    timestamp: str, script_filename: str, script_bytes: bytes
+) -> tuple[Path, Path]:
+    """Create the script directory and write the script (blocking I/O).
+    Returns (script_dir, script_path)."""
+    global _TMP_DIR_READY
+    tmp_dir = SERVER_WORKING_DIR / "tmp"
+    if not _TMP_DIR_READY:
+        tmp_dir.mkdir(exist_ok=True)
+        _TMP_DIR_READY = True
+
+    # mkdtemp atomically creates a unique directory, so concurrent requests
+    # within the same second cannot end up sharing a script directory.
+    # No chmod is needed for shell scripts: they are invoked as an argument
+    # to bash, which does not require the execute bit.
+    script_dir = Path(tempfile.mkdtemp(prefix=f"{timestamp}_", dir=tmp_dir))
+    script_path = script_dir / script_filename
+    script_path.write_bytes(script_bytes)
+    return script_dir, script_path
+
+
+def _json_response(response: RunScriptResponse) -> Response:
+    """Encode a response struct directly to JSON, bypassing response_model"""
+    return Response(
+        content=msgspec.json.encode(response), media_type="application/json"
+    )
 
 
-@app.post("/api/run-script", response_model=RunScriptResponse)
-async def run_script(request: RunScriptRequest):
+@app.post("/api/run-script")
+async def run_script(raw_request: Request):
     """Execute a script (Python or shell) in a timestamped temporary directory"""
-    
+
+    # Parse the body with msgspec (much cheaper than Pydantic validation)
+    try:
+        request = msgspec.json.decode(
+            await raw_request.body(), type=RunScriptRequest
+        )
+    except msgspec.DecodeError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
     # Validate passcode
     if not validate_passcode(request.passcode):
         raise HTTPException(status_code=401, detail="Invalid passcode")
 
     # Validate script type
     if request.scriptType not in ["python", "shell"]:
-        return RunScriptResponse(
+        return _json_response(RunScriptResponse(
             success=False, error="scriptType must be 'python' or 'shell'"
-        )
+        ))
 
     # Validate timeout
     if request.timeout < 1 or request.timeout > 60:
-        return RunScriptResponse(
+        return _json_response(RunScriptResponse(
             success=False, error="Timeout must be between 1 and 60 seconds"
-        )
+        ))
 
     # Validate script
     if not request.script.strip():
-        return RunScriptResponse(success=False, error="Script content is required")
-
-    # Create timestamped directory
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    tmp_dir = SERVER_WORKING_DIR / "tmp"
-    tmp_dir.mkdir(exist_ok=True)
-    
-    script_dir = tmp_dir / timestamp
-    script_dir.mkdir(exist_ok=True)
+        return _json_response(
+            RunScriptResponse(success=False, error="Script content is required")
+        )
 
-    # Get relative paths and set script extension based on type
-    script_dir_rel = script_dir.relative_to(SERVER_WORKING_DIR)
+    # time.strftime formats directly via libc, without constructing a
+    # datetime object on every request
+    timestamp = time.strftime("%Y%m%d_%H%M%S")
     script_filename = "script.py" if request.scriptType == "python" else "script.sh"
-    script_path = script_dir / script_filename
-    script_path_rel = script_path.relative_to(SERVER_WORKING_DIR)
 
     try:
-        # Write script to file
-        script_path.write_text(request.script, encoding="utf-8")
-        
-        # Make shell scripts executable
-        if request.scriptType == "shell":
-            script_path.chmod(0o755)
+        # All setup I/O (directory creation, script write, chmod) happens in
+        # a single thread hop so the event loop keeps servicing other requests
+        script_dir, script_path = await asyncio.to_thread(
+            _prepare_script,
+            timestamp,
+            script_filename,
+            request.script.encode("utf-8"),
+        )
 
-        # Get files and directories before execution
-        files_before = get_files_in_directory(script_dir)
-        directories_before = get_directories_in_directory(script_dir)
+        # Get relative paths by slicing off the working-directory prefix,
+        # avoiding Path.relative_to's pure-Python part comparison
+        script_dir_rel = str(script_dir)[_BASE_STR_LEN:]
+        script_path_rel = str(script_path)[_BASE_STR_LEN:]
 
         # Execute script
-        exit_code, stdout, stderr, timed_out = await run_script_with_timeout(
+        exit_code, stdout_bytes, stderr_bytes, timed_out = await run_script_with_timeout(
             script_path, request.timeout, script_dir, request.scriptType
         )
 
-        # Get files and directories after execution and determine what was created
-        files_after = get_files_in_directory(script_dir)
-        directories_after = get_directories_in_directory(script_dir)
-        created_files = sorted(files_after - files_before)
-        created_directories = sorted(directories_after - directories_before)
+        # The script directory is freshly created, so everything in it besides
+        # the script itself was created by the script - a single scan suffices
+        created_files, created_directories = get_created_entries(
+            script_dir, script_filename
+        )
 
         # Build response message
         if timed_out:
@@ -193,23 +436,24 @@ async def run_script(request: RunScriptRequest):
         else:
             message = f"Script exited with code {exit_code}"
 
-        return RunScriptResponse(
+        return _json_response(RunScriptResponse(
             success=True,
-            scriptDir=str(script_dir_rel),
-            scriptPath=str(script_path_rel),
+            scriptDir=script_dir_rel,
+            scriptPath=script_path_rel,
             exitCode=exit_code,
-            stdout=stdout,
-            stderr=stderr,
+            # Decode captured output exactly once, straight into the response
+            stdout=stdout_bytes.decode("utf-8", errors="replace"),
+            stderr=stderr_bytes.decode("utf-8", errors="replace"),
             timeout=timed_out,
             message=message,
             createdFiles=created_files,
             createdDirectories=created_directories,
-        )
+        ))
 
     except Exception as e:
-        return RunScriptResponse(
+        return _json_response(RunScriptResponse(
             success=False, error=f"Failed to execute script: {str(e)}"
-        )
+        ))
 
 
 @app.head("/files/{file_path:path}")
@@ -217,7 +461,7 @@ async def head_file(file_path: str):
     """HEAD request for files - check if file exists without downloading"""
     
     # Validate path is safe (within working directory)
-    if not is_safe_path(SERVER_WORKING_DIR, file_path):
+    if not is_safe_path(file_path):
         raise HTTPException(
             status_code=400,
             detail="Invalid path: must be within server working directory",
@@ -225,31 +469,30 @@ async def head_file(file_path: str):
 
     full_path = SERVER_WORKING_DIR / file_path
 
-    # Check if file exists
-    if not full_path.exists():
+    # A single stat covers the existence, regular-file, and size checks
+    try:
+        st = os.stat(full_path)
+    except (OSError, ValueError):
         raise HTTPException(status_code=404, detail="File not found")
 
-    if not full_path.is_file():
+    if not stat.S_ISREG(st.st_mode):
         raise HTTPException(status_code=400, detail="Path is not a file")
 
-    # Get file size for Content-Length header
-    file_size = full_path.stat().st_size
-    
     return Response(
         status_code=200,
         headers={
-            "Content-Length": str(file_size),
+            "Content-Length": str(st.st_size),
             "Accept-Ranges": "bytes",
         }
     )
 
 
 @app.get("/files/{file_path:path}")
-async def serve_file(file_path: str, request: Request):
+async def serve_file(file_path: str):
     """Serve files from the server's working directory with range request support"""
-    
+
     # Validate path is safe (within working directory)
-    if not is_safe_path(SERVER_WORKING_DIR, file_path):
+    if not is_safe_path(file_path):
         raise HTTPException(
             status_code=400,
             detail="Invalid path: must be within server working directory",
@@ -257,42 +500,19 @@ async def serve_file(file_path: str, request: Request):
 
     full_path = SERVER_WORKING_DIR / file_path
 
-    # Check if file exists
-    if not full_path.exists():
+    # A single stat covers the existence and regular-file checks
+    try:
+        st = os.stat(full_path)
+    except (OSError, ValueError):
         raise HTTPException(status_code=404, detail="File not found")
 
-    if not full_path.is_file():
+    if not stat.S_ISREG(st.st_mode):
         raise HTTPException(status_code=400, detail="Path is not a file")
 
-    # Handle range requests for better streaming/partial content support
-    range_header = request.headers.get("Range")
-    if range_header:
-        # Parse range header (e.g., "bytes=0-1023")
-        try:
-            range_match = range_header.replace("bytes=", "").split("-")
-            start = int(range_match[0]) if range_match[0] else 0
-            file_size = full_path.stat().st_size
-            end = int(range_match[1]) if range_match[1] else file_size - 1
-            
-            # Read the requested byte range
-            with open(full_path, "rb") as f:
-                f.seek(start)
-                content = f.read(end - start + 1)
-            
-            return Response(
-                content=content,
-                status_code=206,  # Partial Content
-                headers={
-                    "Content-Range": f"bytes {start}-{end}/{file_size}",
-                    "Accept-Ranges": "bytes",
-                    "Content-Length": str(len(content)),
-                }
-            )
-        except (ValueError, IndexError):
-            # Invalid range, fall back to full file
-            pass
-    
-    return FileResponse(full_path)
+    # FileResponse handles Range headers itself (206/416, multipart ranges)
+    # and uses zero-copy file send when the ASGI server supports it; passing
+    # stat_result saves it re-statting the file
+    return FileResponse(full_path, stat_result=st)
 
 
 @app.get("/health")
@@ -301,20 +521,124 @@ async def health_check():
     return {"status": "ok", "workingDir": str(SERVER_WORKING_DIR)}
 
 
-def create_app(working_dir: Path, passcode: str) -> FastAPI:
-    """Create and configure the FastAPI app with a working directory and passcode"""
-    global SERVER_WORKING_DIR, SERVER_PASSCODE
+def _configure(working_dir: Path, passcode: str) -> None:
+    """Set the working directory and passcode, and prime derived state"""
+    global SERVER_WORKING_DIR, SERVER_PASSCODE, _RESOLVED_BASE
+    global _BASE_STR_LEN, _TMP_DIR_READY
+    # Resolve up front: relative paths like Path(".") would otherwise corrupt
+    # the prefix slicing below, since pathlib drops "." when joining
+    working_dir = working_dir.resolve()
     SERVER_WORKING_DIR = working_dir
     SERVER_PASSCODE = passcode
+    _RESOLVED_BASE = str(working_dir)
+    _BASE_STR_LEN = len(_RESOLVED_BASE) + 1
+    _TMP_DIR_READY = False
+    # Validations cached under a previous passcode must not carry over
+    with _PASSCODE_CACHE_LOCK:
+        _PASSCODE_CACHE.clear()
+
+
+def create_app(working_dir: Path, passcode: str) -> FastAPI:
+    """Create and configure the FastAPI app with a working directory and passcode"""
+    _configure(working_dir, passcode)
     return app
 
 
+def _configure_child_watcher():
+    """Use a pidfd-based child watcher for subprocesses where available.
+
+    asyncio's default ThreadedChildWatcher spawns a helper thread for every
+    subprocess, which adds fixed overhead to each script run. On Linux with
+    Python 3.9+, PidfdChildWatcher waits on a single pidfd through the event
+    loop instead. Called from the app lifespan so it runs in each server
+    process; uvloop reaps its own children, so it is skipped when the
+    running loop is not the stdlib one.
+    """
+    if not hasattr(os, "pidfd_open") or not hasattr(asyncio, "PidfdChildWatcher"):
+        return
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        return
+    if type(loop).__module__.partition(".")[0] == "uvloop":
+        return
+    try:
+        import warnings
+
+        with warnings.catch_warnings():
+            # set_child_watcher is deprecated on 3.12+ but still functional
+            warnings.simplefilter("ignore", DeprecationWarning)
+            watcher = asyncio.PidfdChildWatcher()
+            # The watcher reports itself inactive (and subprocess spawning
+            # fails) until a running loop is attached; set_child_watcher
+            # alone does not do this
+            watcher.attach_loop(loop)
+            asyncio.get_event_loop_policy().set_child_watcher(watcher)
+    except Exception:
+        pass
+
+
+async def _start_interpreter_pool() -> None:
+    """Startup hook: fork the interpreter workers for this server process.
+
+    Runs from the app lifespan so that with multiple uvicorn workers each
+    worker process gets its own pool.
+    """
+    global _INTERPRETER_POOL
+    if (
+        _INTERPRETER_POOL is None
+        and hasattr(os, "fork")
+        and SERVER_WORKING_DIR is not None
+    ):
+        pool = InterpreterPool(output_cap_bytes=_OUTPUT_CAP_BYTES)
+        pool.start()
+        _INTERPRETER_POOL = pool
+
+
+# Maximum number of in-flight requests per worker before uvicorn returns 503,
+# bounding queueing under overload
+_LIMIT_CONCURRENCY = 256
+
+
 def run_server(working_dir: Path, host: str = "127.0.0.1", port: int = 3339, passcode: str = ""):
-    """Run the server with uvicorn"""
-    global SERVER_WORKING_DIR, SERVER_PASSCODE
-    SERVER_WORKING_DIR = working_dir
-    SERVER_PASSCODE = passcode
-    
+    """Run the server with uvicorn.
+
+    Worker processes are spawned via multiprocessing, which re-imports the
+    caller's __main__; a script calling this function must therefore guard
+    the call with ``if __name__ == "__main__":`` (the packaged CLI does).
+    """
+    _configure(working_dir, passcode)
+
+    # Worker processes import this module fresh, so the configuration has to
+    # travel through the environment (picked up at the bottom of this module)
+    os.environ["CHATGENERAL_WORKING_DIR"] = str(working_dir)
+    os.environ["CHATGENERAL_PASSCODE"] = passcode
+
+    try:
+        import uvloop  # noqa: F401
+
+        loop = "uvloop"
+    except ImportError:
+        loop = "auto"
+
     import uvicorn
-    
-    uvicorn.run(app, host=host, port=port)
+
+    # Multiple workers let script spawning proceed in parallel across cores
+    # instead of serializing through a single event loop; uvloop and httptools
+    # are C implementations of the loop and HTTP parser
+    uvicorn.run(
+        "chatgeneral.server:app",
+        host=host,
+        port=port,
+        workers=os.cpu_count() or 1,
+        loop=loop,
+        http="httptools",
+        limit_concurrency=_LIMIT_CONCURRENCY,
+    )
+
+
+# uvicorn worker processes import this module without going through
+# run_server; pick up the configuration it left in the environment
+_ENV_WORKING_DIR = os.environ.get("CHATGENERAL_WORKING_DIR")
+if _ENV_WORKING_DIR:
+    _configure(Path(_ENV_WORKING_DIR), os.environ.get("CHATGENERAL_PASSCODE", ""))